@@ -0,0 +1 @@
+# Presente na raiz para que o pytest inclua este diretório no sys.path e os testes possam importar `project`.
@@ -1,5 +1,11 @@
 import random
 import itertools
+import csv
+import json
+import os
+import re
+import argparse
+from datetime import date, datetime, timedelta, timezone
 
 DAYS_OF_WEEK = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira"]
 TIME_SLOTS = [
@@ -13,14 +19,23 @@ TIME_SLOTS = [
     "17:10-18:00",  # T6
 ]
 
+# Rótulo usado nas exportações para cursos sem período definido na grade
+NO_PERIOD_LABEL = "Sem período"
+
+# Fuso horário dos eventos .ics (UFAL, Maceió: UTC-3, sem horário de verão)
+ICS_TZID = "America/Maceio"
+ICS_UTC_OFFSET = timedelta(hours=-3)
+ICS_DEFAULT_WEEKS = 18 # Duração padrão de um semestre letivo
+
 class Course:
-    """Representa um curso com seu nome e o número de sessões semanais necessárias."""
-    def __init__(self, name, sessions_per_week):
+    """Representa um curso com seu nome, o número de sessões semanais necessárias e o período da grade (opcional)."""
+    def __init__(self, name, sessions_per_week, period=None):
         self.name = name
         self.sessions_per_week = sessions_per_week
+        self.period = period # Período da grade curricular (int) ou None
 
     def __repr__(self):
-        return f"Course(name='{self.name}', sessions={self.sessions_per_week})"
+        return f"Course(name='{self.name}', sessions={self.sessions_per_week}, period={self.period})"
 
 class Teacher:
     """Representa um professor com seu nome e os cursos que ele pode lecionar."""
@@ -86,6 +101,10 @@ class GeneticScheduler:
         self.mutation_rate = 0.05
         self.elitism_rate = 0.1 # Porcentagem dos melhores indivíduos a serem transferidos diretamente
 
+        # Preenchidos por solve(): melhor agenda encontrada e última população ordenada por aptidão
+        self.best_schedule_overall = None
+        self.final_population = []
+
     def _generate_random_chromosome(self):
         """
         Gera uma única agenda aleatória (cromossomo).
@@ -260,6 +279,9 @@ class GeneticScheduler:
             if current_best_fitness < min_fitness:
                 min_fitness = current_best_fitness
                 best_schedule = population_with_fitness[0][0]
+                self.best_schedule_overall = best_schedule
+
+            self.final_population = population_with_fitness
 
             # Se uma agenda perfeita (aptidão 0) for encontrada, retorna-a
             if min_fitness == 0:
@@ -315,8 +337,264 @@ class GeneticScheduler:
                 print(f"  {time}: {daily_schedule[day][time]}")
         print("\n---------------------------------")
 
+    def top_schedules(self, k=1):
+        """
+        Retorna as k melhores agendas distintas da última população avaliada por solve(),
+        como uma lista de pares (agenda, aptidão) em ordem crescente de aptidão.
+        """
+        top = []
+        seen = set()
+        for chromosome, fitness in self.final_population:
+            # Identifica agendas repetidas (ex.: elites copiadas) pela sequência de atribuições
+            key = tuple(a and (a[0].name, a[1].name, a[2].name) for a in chromosome.values())
+            if key in seen:
+                continue
+            seen.add(key)
+            top.append((chromosome, fitness))
+            if len(top) == k:
+                break
+        return top
+
+    def _iter_sessions(self, schedule, view):
+        """
+        Percorre as aulas de uma agenda diretamente do cromossomo, na ordem da visualização pedida.
+        Gera tuplas (grupo, slot, curso, professor, sala); slots vazios são ignorados.
+
+        Visualizações:
+        - "slot": por dia da semana, na ordem dos horários.
+        - "teacher": por professor, na ordem em que foram declarados.
+        - "room": por sala, na ordem em que foram declaradas.
+        - "period": por período da grade curricular (cursos sem período ficam por último).
+
+        O grupo é sempre uma string (ex.: o período "1", ou NO_PERIOD_LABEL).
+        """
+        if view == "slot":
+            for slot in self.all_slots:
+                assignment = schedule.get(slot)
+                if assignment is not None:
+                    course, teacher, room = assignment
+                    yield slot.day, slot, course, teacher, room
+            return
+
+        if view == "teacher":
+            group_of = lambda course, teacher, room: teacher.name
+            order = {name: i for i, name in enumerate(self.teacher_names)}
+        elif view == "room":
+            group_of = lambda course, teacher, room: room.name
+            order = {name: i for i, name in enumerate(self.room_names)}
+        elif view == "period":
+            group_of = lambda course, teacher, room: NO_PERIOD_LABEL if course.period is None else str(course.period)
+            order = {}
+        else:
+            raise ValueError(f"Visualização desconhecida: {view!r}")
+
+        # Agrupa apenas referências aos slots (sem montar tabelas de strings)
+        groups = {}
+        for slot in self.all_slots:
+            assignment = schedule.get(slot)
+            if assignment is not None:
+                groups.setdefault(group_of(*assignment), []).append(slot)
+
+        def group_sort_key(group):
+            if view == "period":
+                return (group == NO_PERIOD_LABEL, 0 if group == NO_PERIOD_LABEL else int(group))
+            return (order.get(group, len(order)), group)
+
+        for group in sorted(groups, key=group_sort_key):
+            for slot in groups[group]:
+                course, teacher, room = schedule[slot]
+                yield group, slot, course, teacher, room
+
+    def export_schedules(self, schedules, path, fmt="csv", view="slot", week_start=None,
+                         weeks=ICS_DEFAULT_WEEKS, until=None):
+        """
+        Exporta uma ou mais agendas para CSV, JSON ou iCalendar (.ics), escrevendo cada aula
+        diretamente no arquivo à medida que o cromossomo é percorrido.
+
+        `schedules` pode ser uma única agenda (dicionário) ou uma lista de pares (agenda, aptidão),
+        como a retornada por top_schedules(k). `view` escolhe o agrupamento: "slot", "teacher",
+        "room" ou "period". No formato "ics", `path` é um diretório com um calendário por agenda
+        (e, nas visualizações agrupadas, um por grupo — ex.: um arquivo por professor).
+        Nas visualizações agrupadas não há grupos numa agenda sem aulas, então ela não gera arquivo .ics.
+        `week_start` é a data de início das aulas no .ics (padrão: segunda-feira da semana atual);
+        cada aula começa no primeiro dia da semana correspondente a partir dessa data.
+        As aulas se repetem por `weeks` semanas ou, se `until` (date) for informado, até essa data.
+        """
+        if isinstance(schedules, dict):
+            schedules = [(schedules, self._calculate_fitness(schedules))]
+
+        if fmt == "csv":
+            self._export_csv(schedules, path, view)
+        elif fmt == "json":
+            self._export_json(schedules, path, view)
+        elif fmt == "ics":
+            self._export_ics(schedules, path, view, week_start, weeks, until)
+        else:
+            raise ValueError(f"Formato de exportação desconhecido: {fmt!r}")
+
+    def _export_csv(self, schedules, path, view):
+        """Escreve uma linha por aula: rank, aptidão, grupo, dia, horário, curso, professor e sala."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["rank", "fitness", "group", "day", "time", "course", "teacher", "room"])
+            for rank, (schedule, fitness) in enumerate(schedules, start=1):
+                for group, slot, course, teacher, room in self._iter_sessions(schedule, view):
+                    writer.writerow([rank, fitness, group, slot.day, slot.time, course.name, teacher.name, room.name])
+
+    def _export_json(self, schedules, path, view):
+        """
+        Escreve {"view": ..., "schedules": [{"rank", "fitness", "groups": [{"group", "sessions": [...]}]}]}
+        incrementalmente, serializando uma aula por vez.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"view": %s, "schedules": [' % json.dumps(view))
+            for rank, (schedule, fitness) in enumerate(schedules, start=1):
+                if rank > 1:
+                    f.write(", ")
+                f.write('{"rank": %d, "fitness": %s, "groups": [' % (rank, json.dumps(fitness)))
+                first_group = True
+                current_group = None
+                for group, slot, course, teacher, room in self._iter_sessions(schedule, view):
+                    session = {"day": slot.day, "time": slot.time, "course": course.name,
+                               "teacher": teacher.name, "room": room.name}
+                    if first_group or group != current_group:
+                        # Fecha o grupo anterior (se houver) e abre o novo
+                        if not first_group:
+                            f.write("]}, ")
+                        f.write('{"group": %s, "sessions": [' % json.dumps(group, ensure_ascii=False))
+                        first_group = False
+                        current_group = group
+                    else:
+                        f.write(", ")
+                    f.write(json.dumps(session, ensure_ascii=False))
+                if not first_group:
+                    f.write("]}")
+                f.write("]}")
+            f.write("]}\n")
+
+    def _export_ics(self, schedules, path, view, week_start, weeks, until):
+        """
+        Escreve as aulas como eventos semanais (RRULE:FREQ=WEEKLY) em iCalendar.
+        `path` é um diretório: um calendário por agenda e, nas visualizações agrupadas, um por grupo.
+        """
+        if week_start is None:
+            today = date.today()
+            week_start = today - timedelta(days=today.weekday())
+        if until is not None and until < week_start:
+            raise ValueError(f"until ({until}) é anterior a week_start ({week_start})")
+        if until is None and weeks < 1:
+            raise ValueError(f"weeks deve ser ao menos 1, recebido {weeks}")
+        dtstamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        # Primeira ocorrência de cada dia da semana a partir de week_start (que pode não ser segunda-feira)
+        monday = week_start - timedelta(days=week_start.weekday())
+        dates = {}
+        for i, day in enumerate(self.days):
+            first = monday + timedelta(days=i)
+            if first < week_start:
+                first += timedelta(days=7)
+            dates[day] = first.strftime("%Y%m%d")
+        # Converte "7:30-8:20" em ("073000", "082000") uma única vez por horário
+        time_ranges = {}
+        for time in self.time_slots:
+            begin, end = (datetime.strptime(part.strip(), "%H:%M").strftime("%H%M%S") for part in time.split("-"))
+            time_ranges[time] = (begin, end)
+
+        if until is not None:
+            # Com DTSTART em fuso local, o UNTIL deve estar em UTC (RFC 5545)
+            local_end = datetime(until.year, until.month, until.day, 23, 59, 59, tzinfo=timezone(ICS_UTC_OFFSET))
+            rrule = f"RRULE:FREQ=WEEKLY;UNTIL={local_end.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+        else:
+            rrule = f"RRULE:FREQ=WEEKLY;COUNT={weeks}"
+
+        def escape(text):
+            text = str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            return text.replace("\n", "\\n")
+
+        def slug(text):
+            return re.sub(r"[^\w.-]+", "_", str(text))
+
+        def write_line(f, line):
+            """Escreve uma linha de conteúdo dobrada em no máximo 75 octetos (RFC 5545, seção 3.1)."""
+            data = line.encode("utf-8")
+            start, limit = 0, 75
+            while True:
+                end = min(start + limit, len(data))
+                # Não corta caracteres UTF-8 multibyte ao meio
+                while end < len(data) and (data[end] & 0xC0) == 0x80:
+                    end -= 1
+                f.write(data[start:end].decode("utf-8") + "\r\n")
+                if end >= len(data):
+                    break
+                f.write(" ")
+                start, limit = end, 74 # O espaço inicial da continuação conta no limite
+
+        used_filenames = set()
+
+        def open_calendar(name):
+            # Nomes de grupos distintos podem coincidir após a sanitização; acrescenta um sufixo
+            filename = slug(name)
+            suffix = 2
+            while filename in used_filenames:
+                filename = f"{slug(name)}_{suffix}"
+                suffix += 1
+            used_filenames.add(filename)
+            f = open(os.path.join(path, filename + ".ics"), "w", encoding="utf-8", newline="")
+            for line in ("BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//GeneticScheduler//PT-BR",
+                         f"X-WR-CALNAME:{escape(name)}", f"X-WR-TIMEZONE:{ICS_TZID}",
+                         "BEGIN:VTIMEZONE", f"TZID:{ICS_TZID}", "BEGIN:STANDARD", "DTSTART:19700101T000000",
+                         "TZOFFSETFROM:-0300", "TZOFFSETTO:-0300", "TZNAME:-03", "END:STANDARD", "END:VTIMEZONE"):
+                write_line(f, line)
+            return f
+
+        def close_calendar(f):
+            write_line(f, "END:VCALENDAR")
+            f.close()
+
+        os.makedirs(path, exist_ok=True)
+        calendar = None
+        try:
+            for rank, (schedule, fitness) in enumerate(schedules, start=1):
+                # Na visualização "slot" o grupo (dia) não separa arquivos, e toda agenda
+                # tem seu calendário, mesmo que vazio
+                if view == "slot":
+                    calendar = open_calendar(f"agenda{rank}")
+                current_group = None
+                for index, (group, slot, course, teacher, room) in enumerate(self._iter_sessions(schedule, view)):
+                    if view != "slot" and (calendar is None or group != current_group):
+                        if calendar is not None:
+                            close_calendar(calendar)
+                        calendar = open_calendar(f"agenda{rank}_{view}_{group}")
+                        current_group = group
+
+                    begin, end = time_ranges[slot.time]
+                    description = escape(f"Professor: {teacher.name}\nAgenda #{rank} (aptidão {fitness})")
+                    for line in ("BEGIN:VEVENT",
+                                 f"UID:{view}-{slug(group)}-agenda{rank}-{index}@geneticscheduler",
+                                 f"DTSTAMP:{dtstamp}",
+                                 f"DTSTART;TZID={ICS_TZID}:{dates[slot.day]}T{begin}",
+                                 f"DTEND;TZID={ICS_TZID}:{dates[slot.day]}T{end}",
+                                 rrule,
+                                 f"SUMMARY:{escape(course.name)}",
+                                 f"LOCATION:{escape(room.name)}",
+                                 f"DESCRIPTION:{description}",
+                                 f"CATEGORIES:{escape(group)}",
+                                 "END:VEVENT"):
+                        write_line(calendar, line)
+                if calendar is not None:
+                    close_calendar(calendar)
+                    calendar = None
+        finally:
+            if calendar is not None:
+                close_calendar(calendar)
 
 if __name__ == "__main__":
+    from utils.disciplinas import disciplinas
+
+    parser = argparse.ArgumentParser(description="Gera o horário escolar com um Algoritmo Genético.")
+    parser.add_argument("--exportar", metavar="DIRETORIO",
+                        help="exporta as melhores agendas (CSV, JSON e .ics) para este diretório")
+    args = parser.parse_args()
+
     all_courses = [
         # 1º Período
         Course("Programação 1", 4),
@@ -479,6 +757,11 @@ if __name__ == "__main__":
         ]),
     ]
 
+    # Preenche o período da grade de cada curso a partir de utils/disciplinas.py
+    periodo_por_disciplina = {d["nome"]: d["periodo"] for d in disciplinas}
+    for course in all_courses:
+        course.period = periodo_por_disciplina.get(course.name)
+
     cursos_primeiros_4_periodos = [
         c.name for c in all_courses[:17] 
     ]
@@ -514,6 +797,13 @@ if __name__ == "__main__":
     else:
         print("\nAlgoritmo Genético: Falha ao encontrar um horário ótimo (aptidão 0).")
         print("Considere ajustar os cursos, professores, salas, horários ou parâmetros do GA.")
-        # Opcionalmente, imprime a melhor agenda não ótima encontrada
-        # print("\nMelhor horário não ótimo encontrado:")
-        # scheduler.print_schedule(scheduler.best_schedule_overall) # Precisa armazenar isso em solve()
+
+    # 7. Opcionalmente, exporta as melhores agendas encontradas (mesmo que não ótimas)
+    if args.exportar:
+        os.makedirs(args.exportar, exist_ok=True)
+        melhores = scheduler.top_schedules(k=3)
+        scheduler.export_schedules(melhores, os.path.join(args.exportar, "horarios.csv"), fmt="csv")
+        scheduler.export_schedules(melhores, os.path.join(args.exportar, "horarios_por_professor.json"),
+                                   fmt="json", view="teacher")
+        scheduler.export_schedules(melhores[:1], os.path.join(args.exportar, "calendarios"), fmt="ics", view="room")
+        print(f"\nAgendas exportadas para {os.path.abspath(args.exportar)}")
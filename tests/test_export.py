@@ -0,0 +1,120 @@
+import csv
+import json
+import os
+from datetime import date
+
+import pytest
+
+from project import Course, GeneticScheduler, NO_PERIOD_LABEL, Room, Teacher
+
+VIEWS = ["slot", "teacher", "room", "period"]
+
+
+@pytest.fixture
+def scheduler():
+    courses = [
+        Course("Programação 1", 2, period=1),
+        Course("Banco de Dados", 1, period=2),
+        Course("Computação Evolucionária, Ênfase; Optativa com nome bem comprido", 1),
+    ]
+    # "T/1" e "T 1" geram o mesmo nome de arquivo após a sanitização
+    teachers = [
+        Teacher("T/1", [c.name for c in courses]),
+        Teacher("T 1", [c.name for c in courses]),
+    ]
+    rooms = [Room("Sala 1", 30), Room("Laboratório 1", 30)]
+    return GeneticScheduler(courses, teachers, rooms)
+
+
+@pytest.fixture
+def schedule(scheduler):
+    courses, teachers, rooms = scheduler.courses, scheduler.teachers, scheduler.rooms
+    chromosome = {slot: None for slot in scheduler.all_slots}
+    slots = scheduler.all_slots
+    chromosome[slots[0]] = (courses[0], teachers[0], rooms[0])
+    chromosome[slots[1]] = (courses[0], teachers[1], rooms[1])
+    chromosome[slots[9]] = (courses[1], teachers[0], rooms[1])
+    chromosome[slots[20]] = (courses[2], teachers[1], rooms[0])
+    return chromosome
+
+
+def test_json_export_is_valid_for_every_view(scheduler, schedule, tmp_path):
+    for view in VIEWS:
+        path = tmp_path / f"{view}.json"
+        scheduler.export_schedules([(schedule, 0), ({}, 7)], str(path), fmt="json", view=view)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["view"] == view
+        assert [s["rank"] for s in data["schedules"]] == [1, 2]
+        assert sum(len(g["sessions"]) for g in data["schedules"][0]["groups"]) == 4
+        assert data["schedules"][1]["groups"] == []
+        assert all(isinstance(g["group"], str) for g in data["schedules"][0]["groups"])
+
+
+def test_csv_export_has_one_row_per_session(scheduler, schedule, tmp_path):
+    filled = sum(1 for assignment in schedule.values() if assignment is not None)
+    for view in VIEWS:
+        path = tmp_path / f"{view}.csv"
+        scheduler.export_schedules(schedule, str(path), fmt="csv", view=view)
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == filled
+
+    with open(tmp_path / "period.csv", newline="", encoding="utf-8") as f:
+        groups = [row["group"] for row in csv.DictReader(f)]
+    assert groups == ["1", "1", "2", NO_PERIOD_LABEL]
+
+
+def test_grouped_ics_export_writes_one_file_per_group(scheduler, schedule, tmp_path):
+    expected_groups = {
+        "teacher": 2,
+        "room": 2,
+        "period": 3,
+    }
+    for view, count in expected_groups.items():
+        path = tmp_path / view
+        scheduler.export_schedules(schedule, str(path), fmt="ics", view=view)
+        assert len(os.listdir(path)) == count
+
+
+def test_ics_export_is_well_formed(scheduler, schedule, tmp_path):
+    scheduler.export_schedules([(schedule, 0), ({}, 7)], str(tmp_path), fmt="ics", weeks=10)
+    assert sorted(os.listdir(tmp_path)) == ["agenda1.ics", "agenda2.ics"]
+
+    with open(tmp_path / "agenda1.ics", "rb") as f:
+        content = f.read()
+    lines = content.split(b"\r\n")
+    assert all(len(line) <= 75 for line in lines)
+
+    unfolded = content.decode("utf-8").replace("\r\n ", "")
+    assert unfolded.count("BEGIN:VEVENT") == 4
+    assert unfolded.count("RRULE:FREQ=WEEKLY;COUNT=10") == 4
+    assert "DTSTART;TZID=America/Maceio:" in unfolded
+    uids = [line for line in unfolded.split("\r\n") if line.startswith("UID:")]
+    assert len(set(uids)) == 4
+
+    with open(tmp_path / "agenda2.ics", encoding="utf-8") as f:
+        empty = f.read()
+    assert "BEGIN:VCALENDAR" in empty and "END:VCALENDAR" in empty
+    assert "BEGIN:VEVENT" not in empty
+
+
+def test_ics_export_aligns_non_monday_start(scheduler, schedule, tmp_path):
+    # 03/03/2027 é uma quarta-feira: aulas de segunda passam para 08/03, as de quarta ficam em 03/03
+    scheduler.export_schedules(schedule, str(tmp_path), fmt="ics", week_start=date(2027, 3, 3))
+    with open(tmp_path / "agenda1.ics", encoding="utf-8") as f:
+        starts = [line.strip() for line in f if line.startswith("DTSTART;")]
+    assert starts == [
+        "DTSTART;TZID=America/Maceio:20270308T073000",
+        "DTSTART;TZID=America/Maceio:20270308T092000",
+        "DTSTART;TZID=America/Maceio:20270309T092000",
+        "DTSTART;TZID=America/Maceio:20270303T133000",
+    ]
+
+
+def test_ics_export_rejects_invalid_recurrence(scheduler, schedule, tmp_path):
+    with pytest.raises(ValueError):
+        scheduler.export_schedules(schedule, str(tmp_path), fmt="ics",
+                                   week_start=date(2027, 3, 3), until=date(2027, 2, 1))
+    with pytest.raises(ValueError):
+        scheduler.export_schedules(schedule, str(tmp_path), fmt="ics", weeks=0)